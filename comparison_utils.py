@@ -1,36 +1,233 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 import pandas as pd
 import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 
-def calculate_improvement(baseline_val, comparison_val, metric):
+METRICS = ['RMSE', 'MAE', 'MAPE', 'R2', 'AIC', 'BIC']
+
+# Column widths, from column A onwards
+METRIC_SHEET_WIDTHS = (20, 15, 25, 25)
+SUMMARY_SHEET_WIDTHS = (15, 25, 25)
+
+# Shared styles (one instance each so openpyxl's style table stays small)
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_FONT = Font(color="FFFFFF", bold=True)
+
+GOOD_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+BAD_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+TITLE_FONT = Font(size=14, bold=True)
+SUMMARY_TITLE_FONT = Font(size=16, bold=True)
+BOLD_FONT = Font(bold=True)
+GREEN_FONT = Font(color="006100")
+RED_FONT = Font(color="9C0006")
+CENTER = Alignment(horizontal='center', vertical='center')
+
+# Named styles registered on each openpyxl workbook: name -> style attributes.
+# Prefixed so they cannot clash with Excel's built-in (case-insensitive) names
+NAMED_STYLES = {
+    'cmp_hdr': dict(font=HEADER_FONT, fill=HEADER_FILL, border=THIN_BORDER, alignment=CENTER),
+    'cmp_center': dict(font=DEFAULT_FONT, border=THIN_BORDER, alignment=CENTER),
+    'cmp_good': dict(font=GREEN_FONT, fill=GOOD_FILL, border=THIN_BORDER, alignment=CENTER),
+    'cmp_bad': dict(font=RED_FONT, fill=BAD_FILL, border=THIN_BORDER, alignment=CENTER),
+    'cmp_model': dict(font=BOLD_FONT, border=THIN_BORDER),
+    'cmp_bold_left': dict(font=BOLD_FONT, border=DEFAULT_BORDER),
+    'cmp_title': dict(font=TITLE_FONT, border=DEFAULT_BORDER),
+    'cmp_summary_title': dict(font=SUMMARY_TITLE_FONT, border=DEFAULT_BORDER),
+}
+
+# Named style by improvement state (see improvement_state): neutral, good, bad
+STATE_STYLE = ('cmp_center', 'cmp_good', 'cmp_bad')
+
+
+def _as_float_array(values):
+    """Return values as a float array, keeping float32 input as float32."""
+    values = np.asarray(values)
+    return values if values.dtype == np.float32 else values.astype(float)
+
+
+def calculate_improvement_vec(baseline, comparison, metric):
     """
-    Calculate percentage improvement from baseline to comparison.
+    Calculate percentage improvement from baseline to comparison, element-wise.
     
     For RMSE, MAE, MAPE, AIC, BIC: Lower is better
     For R2: Higher is better
     
-    Returns improvement % (positive = good, negative = bad)
+    Returns an array of improvement % (positive = good, negative = bad),
+    NaN wherever either value is missing or the baseline is zero.
     """
-    if pd.isna(baseline_val) or pd.isna(comparison_val):
-        return np.nan
-    
-    if baseline_val == 0:
-        return np.nan
+    baseline = _as_float_array(baseline)
+    comparison = _as_float_array(comparison)
     
     if metric == 'R2':
         # Higher is better
-        improvement = ((comparison_val - baseline_val) / abs(baseline_val)) * 100
+        diff = comparison - baseline
+        denom = np.abs(baseline)
     else:
         # Lower is better (RMSE, MAE, MAPE, AIC, BIC)
-        improvement = ((baseline_val - comparison_val) / baseline_val) * 100
+        diff = baseline - comparison
+        denom = baseline
+    
+    improvement = np.full(np.broadcast(baseline, comparison).shape, np.nan,
+                          dtype=np.result_type(baseline, comparison))
+    np.divide(diff, denom, out=improvement, where=baseline != 0)
+    return improvement * 100
+
+
+def calculate_improvement(baseline_val, comparison_val, metric):
+    """
+    Calculate percentage improvement from baseline to comparison.
     
-    return improvement
+    Scalar wrapper around calculate_improvement_vec.
+    
+    Returns improvement % (positive = good, negative = bad)
+    """
+    if pd.isna(baseline_val) or pd.isna(comparison_val):
+        return np.nan
+    
+    baseline_val = np.atleast_1d(np.asarray(baseline_val))
+    comparison_val = np.atleast_1d(np.asarray(comparison_val))
+    if baseline_val.dtype.kind not in 'biuf' or comparison_val.dtype.kind not in 'biuf':
+        raise TypeError("calculate_improvement expects numeric values")
+    
+    return float(calculate_improvement_vec(baseline_val, comparison_val, metric)[0])
 
 
-def create_comparison_table(results_df, metric, baseline_label, exog_label, eemd_label):
+def improvement_state(improvements):
+    """
+    Classify improvements for color coding.
+    
+    Returns an int array: 0 = no change / NaN, 1 = improved, 2 = worse,
+    for indexing STATE_STYLE (or an equivalent format tuple).
+    """
+    improvements = np.asarray(improvements, dtype=float)
+    # Comparisons against NaN are False, so missing values fall through to 0
+    return np.select([improvements > 0, improvements < 0], [1, 2], default=0)
+
+
+def _has_scenario_columns(results_df):
+    """True if results_df already tags rows with Scenario and ModelName."""
+    return 'Scenario' in results_df.columns and 'ModelName' in results_df.columns
+
+
+def _split_by_scenario(results_df, baseline_label, exog_label, eemd_label):
+    """
+    Split results into baseline / exogenous / EEMD frames indexed by model name.
+    
+    Done once per results_df so every metric table can reuse the same frames.
+    
+    If results_df already has 'Scenario' ('baseline' / 'exog' / 'eemd') and
+    'ModelName' columns, they are used directly (the fast path, no string
+    work) and the labels are ignored. Otherwise scenarios and model names are
+    parsed from the '{name}-{label}' Model column. Either way only the first
+    row per model and scenario is kept, even if its values are NaN.
+    
+    Returns
+    -------
+    scenario_frames : dict
+        {'baseline': ..., 'exog': ..., 'eemd': ...}, each indexed by ModelName
+    """
+    tagged = _has_scenario_columns(results_df)
+    scenario_frames = {}
+    
+    for key, label in (('baseline', baseline_label), ('exog', exog_label), ('eemd', eemd_label)):
+        if tagged:
+            # Rows are already tagged; no label parsing needed
+            scenario_df = results_df.loc[results_df['Scenario'] == key]
+            model_names = scenario_df['ModelName']
+        else:
+            # Model is built as '{name}-{label}', so match the suffix exactly;
+            # contains() would misclassify labels that are substrings of others
+            suffix = f'-{label}'
+            scenario_df = results_df.loc[results_df['Model'].str.endswith(suffix)]
+            
+            # The suffix is known, so the model name is a plain slice (no replace passes)
+            model_names = scenario_df['Model'].str.slice(stop=-len(suffix))
+        
+        scenario_df = scenario_df.set_axis(pd.Index(model_names, name='ModelName'))
+        
+        # Keep the first result per model, as the per-model lookup always did
+        scenario_frames[key] = scenario_df[~scenario_df.index.duplicated()]
+    
+    return scenario_frames
+
+
+def _align_scenarios(scenario_frames, metric):
+    """
+    Align one metric across the scenario frames from _split_by_scenario.
+    
+    Returns a frame indexed by ModelName (in baseline order) with one
+    column per scenario: 'baseline', 'exog', 'eemd'.
+    """
+    # Two left joins on the ModelName index, keeping the baseline models
+    wide = scenario_frames['baseline'][[metric]].rename(columns={metric: 'baseline'})
+    wide = wide.join(scenario_frames['exog'][metric].rename('exog'), how='left')
+    wide = wide.join(scenario_frames['eemd'][metric].rename('eemd'), how='left')
+    return wide
+
+
+def _nanmean(values):
+    """Mean ignoring NaN (NaN if nothing is left), like pandas' Series.mean."""
+    values = values[~np.isnan(values)]
+    return values.mean() if len(values) else np.nan
+
+
+def metric_avg_improvements(scenario_frames, metric):
+    """
+    Average exogenous and EEMD improvement over baseline for one metric.
+    
+    Works straight from the scenario frames, without building the
+    formatted comparison table.
+    
+    Parameters
+    ----------
+    scenario_frames : dict
+        Output of _split_by_scenario
+    metric : str
+        Metric name (RMSE, MAE, MAPE, R2, AIC, BIC)
+    
+    Returns
+    -------
+    avg_exog, avg_eemd : float
+        Mean improvement % (NaN if no model has a valid improvement)
+    """
+    wide = _align_scenarios(scenario_frames, metric)
+    baseline_vals = _as_float_array(wide['baseline'])
+    exog_imp = calculate_improvement_vec(baseline_vals, _as_float_array(wide['exog']), metric)
+    eemd_imp = calculate_improvement_vec(baseline_vals, _as_float_array(wide['eemd']), metric)
+    return _nanmean(exog_imp), _nanmean(eemd_imp)
+
+
+def _format_values(vals, imps=None):
+    """
+    Format metric values as strings, e.g. '1.234', or '1.234 (+5.6%)' with
+    improvements. Missing values become 'N/A'; missing improvements are omitted.
+    """
+    val_str = pd.Series(vals).map('{:.3f}'.format)
+    if imps is not None:
+        imp_str = pd.Series(imps).map(' ({:+.1f}%)'.format).where(~np.isnan(imps), '')
+        val_str = val_str + imp_str
+    return val_str.where(~np.isnan(vals), 'N/A').to_numpy()
+
+
+def create_comparison_table(results_df, metric, baseline_label, exog_label, eemd_label,
+                            scenario_frames=None):
     """
     Create comparison table for a single metric.
     
@@ -42,219 +239,359 @@ def create_comparison_table(results_df, metric, baseline_label, exog_label, eemd
         Metric name (RMSE, MAE, MAPE, R2, AIC, BIC)
     baseline_label, exog_label, eemd_label : str
         Labels used in the Model column (e.g., 'Sales-Baseline')
+    scenario_frames : dict, optional
+        Output of _split_by_scenario; computed from results_df if not given
+    
+    Notes
+    -----
+    If results_df has 'Scenario' ('baseline' / 'exog' / 'eemd') and
+    'ModelName' columns, they are used directly and the labels are ignored
+    (see _split_by_scenario). Producers of results_df should emit these
+    columns where they can; otherwise scenarios are parsed from the Model labels.
     
     Returns
     -------
     comparison_df : pd.DataFrame
         Formatted comparison table
     """
-    # Extract model names (remove the label suffix)
-    results_df = results_df.copy()
-    results_df['ModelName'] = results_df['Model'].str.replace(f'-{baseline_label}', '', regex=False)
-    results_df['ModelName'] = results_df['ModelName'].str.replace(f'-{exog_label}', '', regex=False)
-    results_df['ModelName'] = results_df['ModelName'].str.replace(f'-{eemd_label}', '', regex=False)
-    
-    # Separate results by scenario
-    baseline_df = results_df[results_df['Model'].str.contains(baseline_label)].copy()
-    exog_df = results_df[results_df['Model'].str.contains(exog_label)].copy()
-    eemd_df = results_df[results_df['Model'].str.contains(eemd_label)].copy()
-    
-    # Get unique model names
-    model_names = baseline_df['ModelName'].unique()
-    
-    # Build comparison table
-    comparison_data = []
-    
-    for model in model_names:
-        baseline_val = baseline_df[baseline_df['ModelName'] == model][metric].values
-        exog_val = exog_df[exog_df['ModelName'] == model][metric].values
-        eemd_val = eemd_df[eemd_df['ModelName'] == model][metric].values
-        
-        baseline_val = baseline_val[0] if len(baseline_val) > 0 else np.nan
-        exog_val = exog_val[0] if len(exog_val) > 0 else np.nan
-        eemd_val = eemd_val[0] if len(eemd_val) > 0 else np.nan
-        
-        # Calculate improvements
-        exog_imp = calculate_improvement(baseline_val, exog_val, metric)
-        eemd_imp = calculate_improvement(baseline_val, eemd_val, metric)
-        
-        # Format values with improvement percentages
-        if not pd.isna(exog_val):
-            exog_str = f"{exog_val:.3f} ({exog_imp:+.1f}%)" if not pd.isna(exog_imp) else f"{exog_val:.3f}"
-        else:
-            exog_str = "N/A"
-        
-        if not pd.isna(eemd_val):
-            eemd_str = f"{eemd_val:.3f} ({eemd_imp:+.1f}%)" if not pd.isna(eemd_imp) else f"{eemd_val:.3f}"
-        else:
-            eemd_str = "N/A"
-        
-        comparison_data.append({
-            'Model': model,
-            'Baseline': f"{baseline_val:.3f}" if not pd.isna(baseline_val) else "N/A",
-            'Exogenous': exog_str,
-            'EEMD': eemd_str,
-            # FIXED: Remove underscore prefix (pandas namedtuples don't support it)
-            'exog_imp': exog_imp,
-            'eemd_imp': eemd_imp
-        })
+    if scenario_frames is None:
+        scenario_frames = _split_by_scenario(results_df, baseline_label, exog_label, eemd_label)
     
-    comparison_df = pd.DataFrame(comparison_data)
+    wide = _align_scenarios(scenario_frames, metric)
+    
+    baseline_vals = _as_float_array(wide['baseline'])
+    exog_vals = _as_float_array(wide['exog'])
+    eemd_vals = _as_float_array(wide['eemd'])
+    
+    # Calculate improvements (positive = good, negative = bad)
+    exog_imp = calculate_improvement_vec(baseline_vals, exog_vals, metric)
+    eemd_imp = calculate_improvement_vec(baseline_vals, eemd_vals, metric)
+    
+    # Format values with improvement percentages
+    comparison_df = pd.DataFrame({
+        'Model': wide.index.to_numpy(),
+        'Baseline': _format_values(baseline_vals),
+        'Exogenous': _format_values(exog_vals, exog_imp),
+        'EEMD': _format_values(eemd_vals, eemd_imp),
+        'exog_imp': exog_imp,
+        'eemd_imp': eemd_imp
+    })
     return comparison_df
 
 
-def create_styled_excel(results_df, output_path, baseline_label, exog_label, eemd_label):
+def _register_named_styles(wb):
+    """Add NAMED_STYLES to wb so cells can reference them by name."""
+    for name, attrs in NAMED_STYLES.items():
+        wb.add_named_style(NamedStyle(name=name, **attrs))
+
+
+def _apply_widths(ws, widths=METRIC_SHEET_WIDTHS):
+    """Set openpyxl column widths on ws, starting from column A."""
+    for idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+
+
+def _styled_cell(ws, value, style):
+    """Build a WriteOnlyCell for ws using one of the NAMED_STYLES."""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _downcast_metrics(results_df):
+    """Return results_df with its metric columns stored as float32."""
+    return results_df.astype({col: 'float32' for col in METRICS if col in results_df.columns})
+
+
+def prepare_metric_payload(results_df, metric, labels, scenario_frames=None):
+    """
+    Prepare everything needed to write one metric's sheet.
+    
+    Pure pandas/numpy work with no workbook access, so it can run in a
+    worker process.
+    
+    Parameters
+    ----------
+    results_df : pd.DataFrame or None
+        Combined results DataFrame; may be None when scenario_frames is given
+    metric : str
+        Metric name (RMSE, MAE, MAPE, R2, AIC, BIC)
+    labels : tuple of str
+        (baseline_label, exog_label, eemd_label)
+    scenario_frames : dict, optional
+        Output of _split_by_scenario (only the metric column is needed);
+        computed from results_df if not given
+    
+    Returns
+    -------
+    payload : dict
+        'comparison_df', 'exog_state', 'eemd_state', 'avg_exog', 'avg_eemd'
+    """
+    if scenario_frames is None:
+        scenario_frames = _split_by_scenario(results_df, *labels)
+    
+    comparison_df = create_comparison_table(results_df, metric, *labels, scenario_frames=scenario_frames)
+    avg_exog, avg_eemd = metric_avg_improvements(scenario_frames, metric)
+    
+    return {
+        'comparison_df': comparison_df,
+        'exog_state': improvement_state(comparison_df['exog_imp'].to_numpy()),
+        'eemd_state': improvement_state(comparison_df['eemd_imp'].to_numpy()),
+        'avg_exog': avg_exog,
+        'avg_eemd': avg_eemd,
+    }
+
+
+def _build_metric_payloads(results_df, labels, parallel=False):
+    """
+    Build the payload for every metric in METRICS.
+    
+    Scenarios are split once and shared by all metrics. With parallel=True
+    each metric is prepared in its own worker process, which receives only
+    that metric's column of the scenario frames rather than all of results_df.
+    """
+    scenario_frames = _split_by_scenario(results_df, *labels)
+    
+    if parallel:
+        metric_frames = (
+            {key: frame[[metric]] for key, frame in scenario_frames.items()}
+            for metric in METRICS
+        )
+        with ProcessPoolExecutor() as executor:
+            payloads = executor.map(prepare_metric_payload, repeat(None), METRICS, repeat(labels),
+                                    metric_frames)
+            return dict(zip(METRICS, payloads))
+    
+    return {
+        metric: prepare_metric_payload(results_df, metric, labels, scenario_frames=scenario_frames)
+        for metric in METRICS
+    }
+
+
+def create_styled_excel(results_df, output_path, baseline_label, exog_label, eemd_label,
+                        engine='openpyxl', parallel=False, downcast=False):
     """
     Create Excel file with comparison tables for all metrics with proper formatting.
     
     Parameters
     ----------
     results_df : pd.DataFrame
-        Combined results DataFrame
+        Combined results DataFrame. May carry 'Scenario' ('baseline' /
+        'exog' / 'eemd') and 'ModelName' columns to skip label parsing
     output_path : str
         Path to save Excel file
     baseline_label, exog_label, eemd_label : str
         Scenario labels
+    engine : {'openpyxl', 'xlsxwriter'}
+        Writer backend; 'xlsxwriter' is faster for large workbooks
+    parallel : bool
+        Prepare the per-metric tables in worker processes. Only worth it
+        for large results_df; process startup dominates for small ones
+    downcast : bool
+        Process metric columns as float32, halving memory traffic. Values
+        sitting on a rounding boundary may then show a different last digit
     """
-    metrics = ['RMSE', 'MAE', 'MAPE', 'R2', 'AIC', 'BIC']
+    if engine == 'xlsxwriter':
+        return create_styled_excel_xlsxwriter(results_df, output_path, baseline_label, exog_label, eemd_label,
+                                              parallel=parallel, downcast=downcast)
+    if engine != 'openpyxl':
+        raise ValueError(f"Unknown engine: {engine!r} (expected 'openpyxl' or 'xlsxwriter')")
+    
+    # Write-only mode streams rows to disk instead of keeping every cell in memory
+    wb = Workbook(write_only=True)
+    
+    # Cells reference these by name instead of carrying their own style objects
+    _register_named_styles(wb)
+    
+    if downcast:
+        results_df = _downcast_metrics(results_df)
     
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
+    # All pandas work happens here; the sheets below only write precomputed values
+    payloads = _build_metric_payloads(results_df, (baseline_label, exog_label, eemd_label), parallel=parallel)
     
-    # Define styles
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
+    # Add summary sheet (created first so it is the first tab)
+    ws_summary = wb.create_sheet(title="Summary")
     
-    improvement_good_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    improvement_bad_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+    # Column widths must be set before any rows are appended in write-only mode
+    _apply_widths(ws_summary, SUMMARY_SHEET_WIDTHS)
     
-    border_thin = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    ws_summary.append([_styled_cell(ws_summary, "Model Performance Summary", 'cmp_summary_title')])
+    ws_summary.append([])
     
-    for metric in metrics:
-        # Create comparison table
-        comparison_df = create_comparison_table(results_df, metric, baseline_label, exog_label, eemd_label)
+    summary_data = []
+    for metric in METRICS:
+        avg_exog, avg_eemd = payloads[metric]['avg_exog'], payloads[metric]['avg_eemd']
+        
+        summary_data.append({
+            'Metric': metric,
+            'Avg Exog Improvement (%)': f"{avg_exog:+.2f}",
+            'Avg EEMD Improvement (%)': f"{avg_eemd:+.2f}"
+        })
+    
+    summary_df = pd.DataFrame(summary_data)
+    
+    for row_idx, row_data in enumerate(dataframe_to_rows(summary_df, index=False, header=True)):
+        if row_idx == 0:  # Header row
+            ws_summary.append([_styled_cell(ws_summary, value, 'cmp_hdr') for value in row_data])
+        else:
+            ws_summary.append([_styled_cell(ws_summary, value, 'cmp_center') for value in row_data])
+    
+    for metric in METRICS:
+        payload = payloads[metric]
+        comparison_df = payload['comparison_df']
         
         # Create worksheet
         ws = wb.create_sheet(title=metric)
         
-        # Add title
-        ws['A1'] = f"{metric} Comparison: Baseline vs Exogenous vs EEMD"
-        ws['A1'].font = Font(size=14, bold=True)
-        ws.merge_cells('A1:E1')
+        # Adjust column widths
+        _apply_widths(ws)
+        
+        # Add title (a single styled cell; write-only sheets cannot merge cells)
+        ws.append([_styled_cell(ws, f"{metric} Comparison: Baseline vs Exogenous vs EEMD", 'cmp_title')])
+        ws.append([])
         
         # Add headers
         headers = ['Model', 'Baseline', 'Exogenous (Δ%)', 'EEMD (Δ%)']
-        for col_idx, header in enumerate(headers, start=1):
-            cell = ws.cell(row=3, column=col_idx, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border_thin
-        
-        # Add data
-        for row_idx, row_data in enumerate(comparison_df.itertuples(index=False), start=4):
-            model = row_data.Model
-            baseline = row_data.Baseline
-            exog = row_data.Exogenous
-            eemd = row_data.EEMD
-            exog_imp = row_data.exog_imp  # FIXED: removed underscore
-            eemd_imp = row_data.eemd_imp  # FIXED: removed underscore
-            
-            # Model name
-            cell = ws.cell(row=row_idx, column=1, value=model)
-            cell.border = border_thin
-            cell.font = Font(bold=True)
-            
-            # Baseline value
-            cell = ws.cell(row=row_idx, column=2, value=baseline)
-            cell.border = border_thin
-            cell.alignment = Alignment(horizontal='center')
-            
-            # Exogenous value with improvement
-            cell = ws.cell(row=row_idx, column=3, value=exog)
-            cell.border = border_thin
-            cell.alignment = Alignment(horizontal='center')
-            
-            # Color code based on improvement
-            if not pd.isna(exog_imp):
-                if exog_imp > 0:
-                    cell.fill = improvement_good_fill
-                    cell.font = Font(color="006100")
-                elif exog_imp < 0:
-                    cell.fill = improvement_bad_fill
-                    cell.font = Font(color="9C0006")
-            
-            # EEMD value with improvement
-            cell = ws.cell(row=row_idx, column=4, value=eemd)
-            cell.border = border_thin
-            cell.alignment = Alignment(horizontal='center')
-            
-            # Color code based on improvement
-            if not pd.isna(eemd_imp):
-                if eemd_imp > 0:
-                    cell.fill = improvement_good_fill
-                    cell.font = Font(color="006100")
-                elif eemd_imp < 0:
-                    cell.fill = improvement_bad_fill
-                    cell.font = Font(color="9C0006")
+        ws.append([_styled_cell(ws, header, 'cmp_hdr') for header in headers])
         
-        # Add summary statistics at bottom
-        summary_row = len(comparison_df) + 5
+        # Add data, one row per model, with cell styles chosen up front
+        display_df = comparison_df[['Model', 'Baseline', 'Exogenous', 'EEMD']]
+        exog_state = payload['exog_state']
+        eemd_state = payload['eemd_state']
         
-        ws.cell(row=summary_row, column=1, value="Average Improvement:").font = Font(bold=True)
+        rows = dataframe_to_rows(display_df, index=False, header=False)
+        for (model, baseline, exog, eemd), exog_st, eemd_st in zip(rows, exog_state, eemd_state):
+            ws.append([
+                _styled_cell(ws, model, 'cmp_model'),
+                _styled_cell(ws, baseline, 'cmp_center'),
+                # Exogenous and EEMD values, color coded based on improvement
+                _styled_cell(ws, exog, STATE_STYLE[exog_st]),
+                _styled_cell(ws, eemd, STATE_STYLE[eemd_st]),
+            ])
         
-        # Calculate average improvements - FIXED: removed underscores
-        avg_exog = comparison_df['exog_imp'].mean()
-        avg_eemd = comparison_df['eemd_imp'].mean()
+        # Add summary statistics at bottom
+        ws.append([])
         
-        ws.cell(row=summary_row, column=2, value="Baseline")
-        ws.cell(row=summary_row, column=3, value=f"{avg_exog:+.2f}%")
-        ws.cell(row=summary_row, column=4, value=f"{avg_eemd:+.2f}%")
+        # Average improvements (precomputed in the payload)
+        avg_exog = payload['avg_exog']
+        avg_eemd = payload['avg_eemd']
         
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 25
-        ws.column_dimensions['D'].width = 25
+        ws.append([
+            _styled_cell(ws, "Average Improvement:", 'cmp_bold_left'),
+            "Baseline",
+            f"{avg_exog:+.2f}%",
+            f"{avg_eemd:+.2f}%",
+        ])
     
-    # Add summary sheet
-    ws_summary = wb.create_sheet(title="Summary", index=0)
-    ws_summary['A1'] = "Model Performance Summary"
-    ws_summary['A1'].font = Font(size=16, bold=True)
+    # Save workbook
+    wb.save(output_path)
+    print(f"\n✅ Comparison tables saved to: {output_path}")
+
+
+def create_styled_excel_xlsxwriter(results_df, output_path, baseline_label, exog_label, eemd_label,
+                                   parallel=False, downcast=False):
+    """
+    XlsxWriter version of create_styled_excel.
     
-    summary_data = []
-    for metric in metrics:
-        comparison_df = create_comparison_table(results_df, metric, baseline_label, exog_label, eemd_label)
-        # FIXED: removed underscores
-        avg_exog = comparison_df['exog_imp'].mean()
-        avg_eemd = comparison_df['eemd_imp'].mean()
-        
-        summary_data.append({
-            'Metric': metric,
-            'Avg Exog Improvement (%)': f"{avg_exog:+.2f}",
-            'Avg EEMD Improvement (%)': f"{avg_eemd:+.2f}"
-        })
+    Produces the same workbook layout, but streams rows straight to the file
+    with XlsxWriter's constant_memory mode and pre-registered formats, which
+    is faster than openpyxl for large workbooks. Requires xlsxwriter.
     
-    summary_df = pd.DataFrame(summary_data)
+    Parameters
+    ----------
+    results_df : pd.DataFrame
+        Combined results DataFrame
+    output_path : str
+        Path to save Excel file
+    baseline_label, exog_label, eemd_label : str
+        Scenario labels
+    parallel : bool
+        Prepare the per-metric tables in worker processes
+    downcast : bool
+        Process metric columns as float32 (see create_styled_excel)
+    """
+    import xlsxwriter
+    
+    if downcast:
+        results_df = _downcast_metrics(results_df)
+    
+    # All pandas work happens here; the sheets below only write precomputed values
+    payloads = _build_metric_payloads(results_df, (baseline_label, exog_label, eemd_label), parallel=parallel)
+    
+    workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    
+    # Define formats (registered once, referenced by every cell)
+    header_fmt = workbook.add_format({
+        'bg_color': '#366092', 'font_color': '#FFFFFF', 'bold': True,
+        'align': 'center', 'valign': 'vcenter', 'border': 1
+    })
+    center_fmt = workbook.add_format({'align': 'center', 'valign': 'vcenter', 'border': 1})
+    good_fmt = workbook.add_format({
+        'bg_color': '#C6EFCE', 'font_color': '#006100', 'align': 'center', 'valign': 'vcenter', 'border': 1
+    })
+    bad_fmt = workbook.add_format({
+        'bg_color': '#FFC7CE', 'font_color': '#9C0006', 'align': 'center', 'valign': 'vcenter', 'border': 1
+    })
+    state_fmt = (center_fmt, good_fmt, bad_fmt)  # indexed by improvement_state
+    model_fmt = workbook.add_format({'bold': True, 'border': 1})
+    bold_fmt = workbook.add_format({'bold': True})
+    title_fmt = workbook.add_format({'bold': True, 'font_size': 14})
+    summary_title_fmt = workbook.add_format({'bold': True, 'font_size': 16})
     
-    for row_idx, row_data in enumerate(dataframe_to_rows(summary_df, index=False, header=True), start=3):
-        for col_idx, value in enumerate(row_data, start=1):
-            cell = ws_summary.cell(row=row_idx, column=col_idx, value=value)
-            if row_idx == 3:  # Header row
-                cell.fill = header_fill
-                cell.font = header_font
-            cell.border = border_thin
-            cell.alignment = Alignment(horizontal='center')
+    # Add summary sheet
+    ws_summary = workbook.add_worksheet("Summary")
+    for col_idx, width in enumerate(SUMMARY_SHEET_WIDTHS):
+        ws_summary.set_column(col_idx, col_idx, width)
+    ws_summary.write(0, 0, "Model Performance Summary", summary_title_fmt)
+    
+    summary_headers = ['Metric', 'Avg Exog Improvement (%)', 'Avg EEMD Improvement (%)']
+    ws_summary.write_row(2, 0, summary_headers, header_fmt)
+    
+    for row_idx, metric in enumerate(METRICS, start=3):
+        avg_exog, avg_eemd = payloads[metric]['avg_exog'], payloads[metric]['avg_eemd']
+        ws_summary.write_row(row_idx, 0, [metric, f"{avg_exog:+.2f}", f"{avg_eemd:+.2f}"], center_fmt)
     
-    ws_summary.column_dimensions['A'].width = 15
-    ws_summary.column_dimensions['B'].width = 25
-    ws_summary.column_dimensions['C'].width = 25
+    for metric in METRICS:
+        payload = payloads[metric]
+        comparison_df = payload['comparison_df']
+        
+        # Create worksheet
+        ws = workbook.add_worksheet(metric)
+        for col_idx, width in enumerate(METRIC_SHEET_WIDTHS):
+            ws.set_column(col_idx, col_idx, width)
+        
+        # Add title
+        ws.write(0, 0, f"{metric} Comparison: Baseline vs Exogenous vs EEMD", title_fmt)
+        
+        # Add headers
+        headers = ['Model', 'Baseline', 'Exogenous (Δ%)', 'EEMD (Δ%)']
+        ws.write_row(2, 0, headers, header_fmt)
+        
+        # Add data (pull each column out once and index by position)
+        models = comparison_df['Model'].to_numpy()
+        baselines = comparison_df['Baseline'].to_numpy()
+        exogs = comparison_df['Exogenous'].to_numpy()
+        eemds = comparison_df['EEMD'].to_numpy()
+        exog_state = payload['exog_state']
+        eemd_state = payload['eemd_state']
+        
+        for i in range(len(models)):
+            row_idx = i + 3
+            ws.write(row_idx, 0, models[i], model_fmt)
+            ws.write(row_idx, 1, baselines[i], center_fmt)
+            
+            # Color code based on improvement
+            ws.write(row_idx, 2, exogs[i], state_fmt[exog_state[i]])
+            ws.write(row_idx, 3, eemds[i], state_fmt[eemd_state[i]])
+        
+        # Add summary statistics at bottom
+        summary_row = len(comparison_df) + 4
+        avg_exog = payload['avg_exog']
+        avg_eemd = payload['avg_eemd']
+        
+        ws.write(summary_row, 0, "Average Improvement:", bold_fmt)
+        ws.write_row(summary_row, 1, ["Baseline", f"{avg_exog:+.2f}%", f"{avg_eemd:+.2f}%"])
     
     # Save workbook
-    wb.save(output_path)
+    workbook.close()
     print(f"\n✅ Comparison tables saved to: {output_path}")